@@ -1,8 +1,34 @@
 import os
-from dotenv import load_dotenv
+from dataclasses import dataclass
+
+
+def _load_env(path=os.path.join(os.path.dirname(os.path.abspath(__file__)), '.env')):
+    """从 .env 文件加载环境变量，已存在的环境变量不会被覆盖"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return
+
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#') or '=' not in line:
+            continue
+        key, value = line.split('=', 1)
+        key = key.strip()
+        if key.startswith('export '):
+            key = key[len('export '):].strip()
+        value = value.strip()
+        if value[:1] in ('"', "'") and value[-1:] == value[:1] and len(value) > 1:
+            value = value[1:-1]
+        elif ' #' in value:
+            # 去掉未加引号值后面的行内注释
+            value = value.split(' #', 1)[0].rstrip()
+        os.environ.setdefault(key, value)
+
 
 # 加载环境变量
-load_dotenv()
+_load_env()
 
 # Notification Configuration
 NOTIFICATION_CONFIG = {
@@ -30,6 +56,9 @@ KEYWORDS = [
     # Add more keywords as needed
 ]
 
+# 去除空白项和重复关键词（保持原有顺序），避免重复查询浪费配额
+KEYWORDS = list(dict.fromkeys(k.strip() for k in KEYWORDS if k.strip()))
+
 
 # Trends Query Configuration
 TRENDS_CONFIG = {
@@ -37,6 +66,16 @@ TRENDS_CONFIG = {
     'geo': '',  # 地区代码，例如: 'US' 表示美国, 'CN' 表示中国, '' 表示全球
 }
 
+
+@dataclass(frozen=True)
+class TrendsQuery:
+    """解析后的趋势查询配置"""
+    timeframe: str
+    geo: str
+
+
+TRENDS = TrendsQuery(**TRENDS_CONFIG)
+
 # Rate Limiting Configuration
 RATE_LIMIT_CONFIG = {
     'max_retries': 3,
@@ -46,6 +85,21 @@ RATE_LIMIT_CONFIG = {
     'batch_interval': 300,  # 批次间隔时间（秒）
 }
 
+
+@dataclass(frozen=True)
+class RateLimit:
+    """解析后的请求频率限制配置，导入时只解析一次"""
+    max_retries: int
+    min_delay_between_queries: float
+    max_delay_between_queries: float
+    batch_size: int
+    batch_interval: float
+
+
+RATE_LIMIT = RateLimit(**RATE_LIMIT_CONFIG)
+BATCH_SIZE = RATE_LIMIT.batch_size
+BATCH_INTERVAL = RATE_LIMIT.batch_interval
+
 # Schedule Configuration
 SCHEDULE_CONFIG = {
     'hour': 23,                    # 计划执行的小时（0-23）
@@ -69,5 +123,6 @@ LOGGING_CONFIG = {
 STORAGE_CONFIG = {
     'data_dir_prefix': 'data_',  # 数据目录前缀
     'report_filename_prefix': 'daily_report_',  # 报告文件名前缀
+    'report_format': 'parquet',  # 报告格式: 'parquet' 或 'csv'
     'json_filename_prefix': 'related_queries_'  # JSON文件名前缀
 } 
\ No newline at end of file
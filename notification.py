@@ -11,6 +11,9 @@ import pandas as pd
 import time
 from wechat_utils import WeChatManager
 
+# 报告文件后缀，这类附件以文字形式发送到微信
+REPORT_SUFFIXES = ('.csv', '.parquet')
+
 class NotificationManager:
     def __init__(self):
         self.wechat_manager = None
@@ -44,9 +47,10 @@ class NotificationManager:
 
             if attachments:
                 for filepath in attachments:
+                    name = os.path.basename(filepath)
                     with open(filepath, 'rb') as f:
-                        part = MIMEApplication(f.read(), Name=os.path.basename(filepath))
-                    part['Content-Disposition'] = f'attachment; filename="{os.path.basename(filepath)}"'
+                        part = MIMEApplication(f.read(), Name=name)
+                    part['Content-Disposition'] = f'attachment; filename="{name}"'
                     msg.attach(part)
 
             with smtplib.SMTP(EMAIL_CONFIG['smtp_server'], EMAIL_CONFIG['smtp_port']) as server:
@@ -243,19 +247,22 @@ class NotificationManager:
                     raise Exception(f"Cannot find receiver: {receiver_name}")
                 
                 report_data = None
-                if attachments and any(f.endswith('.csv') for f in attachments):
-                    csv_file = next(f for f in attachments if f.endswith('.csv'))
+                report_file = next((f for f in attachments or () if f.endswith(REPORT_SUFFIXES)), None)
+                if report_file:
                     try:
-                        report_data = pd.read_csv(csv_file)
+                        if report_file.endswith('.parquet'):
+                            report_data = pd.read_parquet(report_file)
+                        else:
+                            report_data = pd.read_csv(report_file)
                     except Exception as e:
-                        logging.warning(f"Failed to read report CSV file: {str(e)}")
+                        logging.warning(f"Failed to read report file: {str(e)}")
                 
                 message = self._format_wechat_message(subject, body, report_data)
                 self._send_wechat_message_in_chunks(message, receiver_id)
                 
                 if attachments:
                     for filepath in attachments:
-                        if not filepath.endswith('.csv'):
+                        if not filepath.endswith(REPORT_SUFFIXES):
                             file_message = f"\n📎 正在发送文件: {os.path.basename(filepath)}"
                             if not self.wechat_manager.send_message(file_message, receiver_id):
                                 raise Exception("Failed to send file message")
@@ -3,6 +3,7 @@ import pandas as pd
 import json
 import time
 import random
+import threading
 from datetime import datetime
 import requests
 from urllib.parse import quote
@@ -195,6 +196,7 @@ class RequestLimiter:
         self.requests = []  # 存储请求时间戳
         self.max_requests_per_min = 30  # 每分钟最大请求数
         self.max_requests_per_hour = 200  # 每小时最大请求数
+        self._lock = threading.Lock()  # 多线程查询时保护请求记录
         
     def can_make_request(self):
         """检查是否可以发起新请求"""
@@ -221,11 +223,15 @@ class RequestLimiter:
     
     def wait_if_needed(self):
         """如果需要，等待直到可以发送请求"""
-        while not self.can_make_request():
+        while True:
+            # 检查与记录在同一把锁内完成，避免多个线程同时通过检查
+            with self._lock:
+                if self.can_make_request():
+                    self.add_request()
+                    return
             wait_time = random.uniform(5, 10)
             print(f"达到请求限制，等待 {wait_time:.1f} 秒...")
             time.sleep(wait_time)
-        self.add_request()
 
 # 创建全局请求限制器
 request_limiter = RequestLimiter()
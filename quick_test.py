@@ -58,8 +58,9 @@ def main():
             if 'rising' in data and data['rising'] is not None:
                 rising = data['rising']
                 print(f"\n  📈 上升趋势 (共 {len(rising)} 条):")
-                for i, row in enumerate(rising.head(5).itertuples(), 1):
-                    value = row.value if hasattr(row, 'value') else 'N/A'
+                has_value = 'value' in rising.columns
+                for i, row in enumerate(rising.head(5).itertuples(index=False), 1):
+                    value = row.value if has_value else 'N/A'
                     print(f"    {i}. {row.query} - 增长: {value}")
             else:
                 print("\n  📈 上升趋势: 无数据")
@@ -68,8 +69,9 @@ def main():
             if 'top' in data and data['top'] is not None:
                 top = data['top']
                 print(f"\n  🔥 热门趋势 (共 {len(top)} 条):")
-                for i, row in enumerate(top.head(5).itertuples(), 1):
-                    value = row.value if hasattr(row, 'value') else 'N/A'
+                has_value = 'value' in top.columns
+                for i, row in enumerate(top.head(5).itertuples(index=False), 1):
+                    value = row.value if has_value else 'N/A'
                     print(f"    {i}. {row.query} - 热度: {value}")
             else:
                 print("\n  🔥 热门趋势: 无数据")
@@ -23,6 +23,14 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+def show_my_info():
+    """显示自己的微信昵称，仅在登录成功后才导入 itchat"""
+    import itchat
+    my_info = itchat.search_friends()
+    if my_info:
+        print(f"\n你的微信昵称: {my_info[0]['NickName']}")
+        print(f"备注名: {my_info[0].get('RemarkName', '无')}")
+
 def main():
     print("=" * 60)
     print("微信登录测试")
@@ -42,11 +50,7 @@ def main():
         print("=" * 60)
         
         # 获取自己的信息
-        import itchat
-        my_info = itchat.search_friends()
-        if my_info:
-            print(f"\n你的微信昵称: {my_info[0]['NickName']}")
-            print(f"备注名: {my_info[0].get('RemarkName', '无')}")
+        show_my_info()
         
         print("\n登录状态已保存，下次运行时可以自动登录")
         print("=" * 60)
@@ -12,6 +12,15 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+def show_my_info():
+    """显示自己的微信信息，仅在需要时才导入 itchat"""
+    import itchat
+    my_info = itchat.search_friends()
+    if my_info:
+        print(f"\n你的微信信息:")
+        print(f"  昵称: {my_info[0]['NickName']}")
+        print(f"  备注名: {my_info[0].get('RemarkName', '无')}")
+
 def main():
     print("=" * 70)
     print("微信登录状态检查")
@@ -24,14 +33,6 @@ def main():
     if manager.check_login_status():
         print("✅ 微信已登录！")
         
-        # 获取自己的信息
-        import itchat
-        my_info = itchat.search_friends()
-        if my_info:
-            print(f"\n你的微信信息:")
-            print(f"  昵称: {my_info[0]['NickName']}")
-            print(f"  备注名: {my_info[0].get('RemarkName', '无')}")
-        
         # 测试发送消息
         print("\n" + "=" * 70)
         print("测试发送消息")
@@ -40,6 +41,8 @@ def main():
         choice = input("\n是否要测试发送消息到文件传输助手？(y/n): ").strip().lower()
         
         if choice == 'y':
+            show_my_info()
+            
             test_msg = "🤖 这是来自 Google Trends 监控工具的测试消息\n\n如果你看到这条消息，说明微信通知功能正常工作！"
             
             print("\n正在发送测试消息...")
@@ -1,45 +1,73 @@
 import os
-import pandas as pd
 from datetime import datetime, timedelta
-import schedule
 import time
 import random
-from querytrends import batch_get_queries, save_related_queries, RequestLimiter
 import json
+import csv
 import logging
-import backoff
 import argparse
+import functools
+import itertools
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from config import (
     EMAIL_CONFIG, 
     KEYWORDS, 
-    RATE_LIMIT_CONFIG, 
+    RATE_LIMIT,
+    BATCH_SIZE,
+    BATCH_INTERVAL,
     SCHEDULE_CONFIG,
     MONITOR_CONFIG,
     LOGGING_CONFIG,
     STORAGE_CONFIG,
-    TRENDS_CONFIG,
+    TRENDS,
     NOTIFICATION_CONFIG
 )
-from notification import NotificationManager
-
-# Configure logging
-logging.basicConfig(
-    level=getattr(logging, LOGGING_CONFIG['level']),
-    format=LOGGING_CONFIG['format'],
-    handlers=[
-        logging.FileHandler(LOGGING_CONFIG['log_file']),
-        logging.StreamHandler()
-    ]
-)
 
-# 创建请求限制器实例
-request_limiter = RequestLimiter()
+# 每日报告的文件格式，可用 --csv 切换回 CSV
+REPORT_FORMAT = STORAGE_CONFIG.get('report_format', 'parquet')
+
+# 预先生成的随机延迟表，循环取用：_QUERY_DELAYS 用于错开同一批次内的查询，
+# _BATCH_JITTER 用于批次之间的等待
+_QUERY_DELAYS = itertools.cycle([
+    random.uniform(RATE_LIMIT.min_delay_between_queries, RATE_LIMIT.max_delay_between_queries)
+    for _ in range(64)
+])
+_BATCH_JITTER = itertools.cycle([random.uniform(0, 60) for _ in range(64)])
+
+# 高增长趋势提醒中每一行的 HTML 模板
+_ALERT_ROW = (
+    '<tr>'
+    '<td><strong>🎯 {kw}</strong></td>'
+    '<td>➡️ {rk}</td>'
+    '<td align="right" style="color: #28a745;">⬆️ {v}%</td>'
+    '</tr>'
+).format
+
+def _configure_logging():
+    """Configure logging; only called when run as a script so imports don't create the log file"""
+    logging.basicConfig(
+        level=getattr(logging, LOGGING_CONFIG['level']),
+        format=LOGGING_CONFIG['format'],
+        handlers=[
+            logging.FileHandler(LOGGING_CONFIG['log_file']),
+            logging.StreamHandler()
+        ]
+    )
+
+@functools.cache
+def get_notification_manager():
+    """首次使用时创建通知管理器实例，避免导入时加载邮件和微信依赖"""
+    from notification import NotificationManager
 
-# 创建通知管理器实例
-notification_manager = NotificationManager()
+    return NotificationManager()
 
 def send_email(subject, body, attachments=None):
     """Send email with optional attachments"""
+    import smtplib
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+    from email.mime.application import MIMEApplication
+
     try:
         msg = MIMEMultipart()
         msg['From'] = EMAIL_CONFIG['sender_email']
@@ -50,9 +78,10 @@ def send_email(subject, body, attachments=None):
 
         if attachments:
             for filepath in attachments:
+                name = os.path.basename(filepath)
                 with open(filepath, 'rb') as f:
-                    part = MIMEApplication(f.read(), Name=os.path.basename(filepath))
-                part['Content-Disposition'] = f'attachment; filename="{os.path.basename(filepath)}"'
+                    part = MIMEApplication(f.read(), Name=name)
+                part['Content-Disposition'] = f'attachment; filename="{name}"'
                 msg.attach(part)
 
         # Gmail使用SMTP然后升级到TLS
@@ -73,59 +102,99 @@ def send_email(subject, body, attachments=None):
         # 不要立即抛出异常，让程序继续运行
         return False
 
-def create_daily_directory():
-    """Create a directory for today's data"""
-    today = datetime.now().strftime('%Y%m%d')
-    directory = f"{STORAGE_CONFIG['data_dir_prefix']}{today}"
-    if not os.path.exists(directory):
-        os.makedirs(directory)
+# 当天数据目录的缓存: (日期, 目录)
+_TODAY_DIR = None
+
+def create_daily_directory(run_date):
+    """Create a directory for the given run date (YYYYMMDD)"""
+    global _TODAY_DIR
+    if _TODAY_DIR is not None and _TODAY_DIR[0] == run_date:
+        return _TODAY_DIR[1]
+    directory = f"{STORAGE_CONFIG['data_dir_prefix']}{run_date}"
+    os.makedirs(directory, exist_ok=True)
+    _TODAY_DIR = (run_date, directory)
     return directory
 
 def check_rising_trends(data, keyword, threshold=MONITOR_CONFIG['rising_threshold']):
     """Check if any rising trends exceed the threshold"""
+    import pandas as pd
+
     if not data or 'rising' not in data or data['rising'] is None:
         return []
     
-    rising_trends = []
     df = data['rising']
-    if isinstance(df, pd.DataFrame):
-        for _, row in df.iterrows():
-            if row['value'] > threshold:
-                rising_trends.append((row['query'], row['value']))
-    return rising_trends
-
-def generate_daily_report(results, directory):
-    """Generate a daily report in CSV format"""
-    report_data = []
+    if not isinstance(df, pd.DataFrame) or df.empty or 'value' not in df:
+        return []
+    mask = df['value'] > threshold
+    return list(zip(df.loc[mask, 'query'], df.loc[mask, 'value']))
+
+def generate_daily_report(results, directory, run_date, report_format=None):
+    """Generate a daily report in Parquet or CSV format
+
+    Args:
+        results (dict): Query results keyed by keyword
+        directory (str): Directory to write the report into
+        run_date (str): Run date in YYYYMMDD format
+        report_format (str): 'parquet' or 'csv', defaults to REPORT_FORMAT
+
+    Returns:
+        str: Path of the written report, or None if there is no data
+    """
+    import pandas as pd
+
+    report_sources = []
     
     for keyword, data in results.items():
-        if data and isinstance(data.get('rising'), pd.DataFrame):
-            rising_df = data['rising']
-            for _, row in rising_df.iterrows():
-                report_data.append({
-                    'keyword': keyword,
-                    'related_keywords': row['query'],
-                    'value': row['value'],
-                    'type': 'rising'
-                })
-        
-        if data and isinstance(data.get('top'), pd.DataFrame):
-            top_df = data['top']
-            for _, row in top_df.iterrows():
-                report_data.append({
+        if not data:
+            continue
+        for trend_type in ('rising', 'top'):
+            df = data.get(trend_type)
+            if isinstance(df, pd.DataFrame) and not df.empty:
+                report_sources.append((keyword, trend_type, df))
+    
+    if not report_sources:
+        return None
+
+    report_base = os.path.join(directory, f"{STORAGE_CONFIG['report_filename_prefix']}{run_date}")
+    if (report_format or REPORT_FORMAT) == 'parquet':
+        report_file = _write_parquet_report(report_sources, report_base + '.parquet')
+        if report_file:
+            return report_file
+
+    report_file = report_base + '.csv'
+    # 逐行写入 CSV，避免先拼出完整的 DataFrame
+    with open(report_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['keyword', 'related_keywords', 'value', 'type'])
+        writer.writeheader()
+        for keyword, trend_type, df in report_sources:
+            for query, value in df[['query', 'value']].itertuples(index=False, name=None):
+                writer.writerow({
                     'keyword': keyword,
-                    'related_keywords': row['query'],
-                    'value': row['value'],
-                    'type': 'top'
+                    'related_keywords': query,
+                    'value': value,
+                    'type': trend_type
                 })
-    
-    if report_data:
-        df = pd.DataFrame(report_data)
-        filename = f"{STORAGE_CONFIG['report_filename_prefix']}{datetime.now().strftime('%Y%m%d')}.csv"
-        report_file = os.path.join(directory, filename)
-        df.to_csv(report_file, index=False)
-        return report_file
-    return None
+    return report_file
+
+def _write_parquet_report(report_sources, report_file):
+    """以 snappy 压缩的 Parquet 格式写入报告，缺少 pyarrow 时返回 None"""
+    import pandas as pd
+
+    df = pd.concat(
+        [
+            df[['query', 'value']]
+            .rename(columns={'query': 'related_keywords'})
+            .assign(keyword=keyword, type=trend_type)
+            for keyword, trend_type, df in report_sources
+        ],
+        ignore_index=True
+    )[['keyword', 'related_keywords', 'value', 'type']]
+    try:
+        df.to_parquet(report_file, compression='snappy', engine='pyarrow', index=False)
+    except ImportError:
+        logging.warning("pyarrow is not installed, falling back to CSV report")
+        return None
+    return report_file
 
 def get_date_range_timeframe(timeframe):
     """Convert special timeframe formats to date range format
@@ -138,11 +207,15 @@ def get_date_range_timeframe(timeframe):
     """
     if not timeframe.startswith('last-'):
         return timeframe
-        
+    # 以当天日期作为缓存键的一部分，跨天运行时不会返回过期的日期范围
+    return _date_range_timeframe(timeframe, datetime.now().date())
+
+@functools.lru_cache(maxsize=32)
+def _date_range_timeframe(timeframe, end_date):
+    """根据结束日期计算 'last-N-d' 对应的日期范围"""
     try:
         # 解析天数
         days = int(timeframe.split('-')[1])
-        end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
         # 格式化日期字符串
         return f"{start_date.strftime('%Y-%m-%d')} {end_date.strftime('%Y-%m-%d')}"
@@ -152,18 +225,33 @@ def get_date_range_timeframe(timeframe):
 
 def process_keywords_batch(keywords_batch, directory, all_results, high_rising_trends, timeframe):
     """处理一批关键词"""
+    from querytrends import save_related_queries
+
     try:
         logging.info(f"Processing batch of {len(keywords_batch)} keywords")
-        logging.info(f"Query parameters: timeframe={timeframe}, geo={TRENDS_CONFIG['geo'] or 'Global'}")
+        logging.info(f"Query parameters: timeframe={timeframe}, geo={TRENDS.geo or 'Global'}")
         
-        # 使用传入的 timeframe 参数
-        results = get_trends_with_retry(keywords_batch, timeframe)
+        # 每个关键词单独提交到线程池，提交之间仍按配置的查询间隔错开，
+        # 只让已发出的请求在等待响应和重试时相互重叠
+        results = {}
+        with ThreadPoolExecutor(max_workers=BATCH_SIZE) as executor:
+            futures = {}
+            for index, keyword in enumerate(keywords_batch):
+                if index:
+                    delay = next(_QUERY_DELAYS)
+                    logging.info(f"Waiting {delay:.1f} seconds before querying {keyword}...")
+                    time.sleep(delay)
+                futures[executor.submit(get_trends_with_retry, [keyword], timeframe)] = keyword
+            for future in as_completed(futures):
+                results.update(future.result())
         
-        for keyword, data in results.items():
+        # 按原关键词顺序处理结果，保持报告顺序稳定
+        for keyword in keywords_batch:
+            data = results.get(keyword)
             if data:
                 filename = save_related_queries(keyword, data)
                 if filename:
-                    os.rename(filename, os.path.join(directory, filename))
+                    os.replace(filename, os.path.join(directory, os.path.basename(filename)))
                 
                 rising_trends = check_rising_trends(data, keyword)
                 if rising_trends:
@@ -177,42 +265,56 @@ def process_keywords_batch(keywords_batch, directory, all_results, high_rising_t
         logging.error(f"Error processing batch: {str(e)}")
         return False
 
-@backoff.on_exception(
-    backoff.expo,
-    Exception,
-    max_tries=RATE_LIMIT_CONFIG['max_retries'],
-    jitter=backoff.full_jitter
-)
-def get_trends_with_retry(keywords_batch, timeframe):
-    """使用重试机制获取趋势数据"""
+def _fetch_trends(keywords_batch, timeframe):
+    """获取一批关键词的趋势数据"""
+    from querytrends import batch_get_queries
+
     return batch_get_queries(
         keywords_batch,
         timeframe=timeframe,  # 使用传入的 timeframe
-        geo=TRENDS_CONFIG['geo'],
-        delay_between_queries=random.uniform(
-            RATE_LIMIT_CONFIG['min_delay_between_queries'],
-            RATE_LIMIT_CONFIG['max_delay_between_queries']
-        )
+        geo=TRENDS.geo,
+        # 单个关键词时不会有查询间隔，无需取用延迟表
+        delay_between_queries=next(_QUERY_DELAYS) if len(keywords_batch) > 1 else 0
     )
 
+@functools.lru_cache(maxsize=None)
+def _fetch_trends_with_backoff():
+    """首次使用时才导入 backoff 并构建带重试的查询函数"""
+    import backoff
+
+    return backoff.on_exception(
+        backoff.expo,
+        Exception,
+        max_tries=RATE_LIMIT.max_retries,
+        jitter=backoff.full_jitter
+    )(_fetch_trends)
+
+def get_trends_with_retry(keywords_batch, timeframe):
+    """使用重试机制获取趋势数据"""
+    return _fetch_trends_with_backoff()(keywords_batch, timeframe)
+
 def process_trends():
     """Main function to process trends data"""
     try:
         logging.info("Starting daily trends processing")
         
+        # 本次运行只取一次当前时间，保证跨午夜时各产物日期一致
+        run_time = datetime.now()
+        run_date = run_time.strftime('%Y%m%d')
+        
         # 处理特殊的 timeframe 格式
-        timeframe = TRENDS_CONFIG['timeframe']
+        timeframe = TRENDS.timeframe
         actual_timeframe = get_date_range_timeframe(timeframe)
         
-        logging.info(f"Using configuration: timeframe={actual_timeframe}, geo={TRENDS_CONFIG['geo'] or 'Global'}")
-        directory = create_daily_directory()
+        logging.info(f"Using configuration: timeframe={actual_timeframe}, geo={TRENDS.geo or 'Global'}")
+        directory = create_daily_directory(run_date)
         
         all_results = {}
         high_rising_trends = []
         
         # 将关键词分批处理，使用实际的 timeframe
-        for i in range(0, len(KEYWORDS), RATE_LIMIT_CONFIG['batch_size']):
-            keywords_batch = KEYWORDS[i:i + RATE_LIMIT_CONFIG['batch_size']]
+        for i in range(0, len(KEYWORDS), BATCH_SIZE):
+            keywords_batch = KEYWORDS[i:i + BATCH_SIZE]
             # 传递实际的 timeframe 到查询函数
             success = process_keywords_batch(
                 keywords_batch, 
@@ -227,13 +329,13 @@ def process_trends():
                 continue
             
             # 如果不是最后一批，等待一段时间再处理下一批
-            if i + RATE_LIMIT_CONFIG['batch_size'] < len(KEYWORDS):
-                wait_time = RATE_LIMIT_CONFIG['batch_interval'] + random.uniform(0, 60)
+            if i + BATCH_SIZE < len(KEYWORDS):
+                wait_time = BATCH_INTERVAL + next(_BATCH_JITTER)
                 logging.info(f"Waiting {wait_time:.1f} seconds before processing next batch...")
                 time.sleep(wait_time)
 
         # Generate and send daily report
-        report_file = generate_daily_report(all_results, directory)
+        report_file = generate_daily_report(all_results, directory, run_date)
         if report_file:
             report_body = """
             <h2>Daily Trends Report</h2>
@@ -250,14 +352,14 @@ def process_trends():
             <li>Failed queries: {}</li>
             </ul>
             """.format(
-                TRENDS_CONFIG['timeframe'],
-                TRENDS_CONFIG['geo'] or 'Global',
+                TRENDS.timeframe,
+                TRENDS.geo or 'Global',
                 len(KEYWORDS),
                 len(all_results),
                 len(KEYWORDS) - len(all_results)
             )
-            if not notification_manager.send_notification(
-                subject=f"Daily Trends Report - {datetime.now().strftime('%Y-%m-%d')}",
+            if not get_notification_manager().send_notification(
+                subject=f"Daily Trends Report - {run_time.strftime('%Y-%m-%d')}",
                 body=report_body,
                 attachments=[report_file]
             ):
@@ -272,13 +374,13 @@ def process_trends():
                 batch_number = i // batch_size + 1
                 total_batches = (len(high_rising_trends) + batch_size - 1) // batch_size
                 
-                alert_body = f"""
+                alert_parts = [f"""
                 <h2>📊 High Rising Trends Alert</h2>
                 <hr>
                 <h3>📌 Query Parameters:</h3>
                 <ul>
-                    <li>🕒 Time Range: {TRENDS_CONFIG['timeframe']}</li>
-                    <li>🌍 Region: {TRENDS_CONFIG['geo'] or 'Global'}</li>
+                    <li>🕒 Time Range: {TRENDS.timeframe}</li>
+                    <li>🌍 Region: {TRENDS.geo or 'Global'}</li>
                 </ul>
                 <h3>📈 Significant Growth Trends:</h3>
                 <table border="1" cellpadding="5" style="border-collapse: collapse;">
@@ -287,23 +389,19 @@ def process_trends():
                         <th>🔗 Related Query</th>
                         <th>📈 Growth</th>
                     </tr>
-                """
+                """]
                 
                 for keyword, related_keywords, value in batch_trends:
-                    alert_body += f"""
-                    <tr>
-                        <td><strong>🎯 {keyword}</strong></td>
-                        <td>➡️ {related_keywords}</td>
-                        <td align="right" style="color: #28a745;">⬆️ {value}%</td>
-                    </tr>
-                    """
+                    alert_parts.append(_ALERT_ROW(kw=keyword, rk=related_keywords, v=value))
                 
-                alert_body += "</table>"
+                alert_parts.append("</table>")
                 
                 if batch_number < total_batches:
-                    alert_body += f"<p><i>This is batch {batch_number} of {total_batches}. More results will follow.</i></p>"
+                    alert_parts.append(f"<p><i>This is batch {batch_number} of {total_batches}. More results will follow.</i></p>")
+                
+                alert_body = ''.join(alert_parts)
                 
-                if not notification_manager.send_notification(
+                if not get_notification_manager().send_notification(
                     subject=f"📊 Rising Trends Alert ({batch_number}/{total_batches})",
                     body=alert_body
                 ):
@@ -316,7 +414,7 @@ def process_trends():
         return True
     except Exception as e:
         logging.error(f"Error in trends processing: {str(e)}")
-        notification_manager.send_notification(
+        get_notification_manager().send_notification(
             subject="❌ Error in Trends Processing",
             body=f"<p>An error occurred during trends processing:</p><pre>{str(e)}</pre>"
         )
@@ -324,6 +422,8 @@ def process_trends():
 
 def run_scheduler():
     """Run the scheduler"""
+    import schedule
+
     # 从配置中获取小时和分钟
     schedule_hour = SCHEDULE_CONFIG['hour']
     schedule_minute = SCHEDULE_CONFIG.get('minute', 0)  # 默认为0分钟
@@ -350,9 +450,11 @@ def run_scheduler():
         next_run = scheduled_time + timedelta(days=1)
         time.sleep((next_run - now).total_seconds())
     
+    # 直接睡眠到下一次计划执行时间，避免每分钟空轮询
     while True:
+        next_run = schedule.next_run()
+        time.sleep(max(1, (next_run - datetime.now()).total_seconds()))
         schedule.run_pending()
-        time.sleep(60)
 
 if __name__ == "__main__":
     # 创建命令行参数解析器
@@ -361,8 +463,15 @@ if __name__ == "__main__":
                       help='立即运行一次数据收集，而不是等待计划时间')
     parser.add_argument('--keywords', nargs='+',
                       help='测试时要查询的关键词列表，如果不指定则使用配置文件中的关键词')
+    parser.add_argument('--csv', action='store_true',
+                      help='以 CSV 格式生成每日报告（默认为 Parquet）')
     args = parser.parse_args()
 
+    if args.csv:
+        REPORT_FORMAT = 'csv'
+
+    _configure_logging()
+
     # 检查邮件配置（仅在需要邮件通知时检查）
     if NOTIFICATION_CONFIG['method'] in ['email', 'both']:
         if not all([
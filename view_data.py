@@ -4,41 +4,69 @@
 """
 
 import os
-import json
 import pandas as pd
 from datetime import datetime
 from tabulate import tabulate
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_loads = json.loads
+
 def list_data_directories():
     """列出所有数据目录"""
     dirs = [d for d in os.listdir('.') if d.startswith('data_') and os.path.isdir(d)]
     return sorted(dirs, reverse=True)
 
+# 报告中用到的列
+REPORT_COLUMNS = ['keyword', 'related_keywords', 'value', 'type']
+
+def read_report(report_file):
+    """读取报告文件，支持 Parquet 和 CSV 格式"""
+    if report_file.endswith('.parquet'):
+        return pd.read_parquet(report_file, columns=REPORT_COLUMNS)
+    return read_report_csv(report_file)
+
+def read_report_csv(csv_file):
+    """读取 CSV 报告，优先使用 pyarrow 引擎"""
+    try:
+        return pd.read_csv(csv_file, usecols=REPORT_COLUMNS, engine='pyarrow')
+    except (ImportError, ValueError):
+        # 未安装 pyarrow 或 pandas 版本不支持时使用默认引擎
+        return pd.read_csv(csv_file, usecols=REPORT_COLUMNS)
+
 def view_csv_report(directory):
-    """查看 CSV 报告"""
-    csv_files = [f for f in os.listdir(directory) if f.endswith('.csv')]
+    """查看每日报告（Parquet 或 CSV）"""
+    # 同时存在两种格式时优先使用 Parquet
+    report_files = sorted(
+        (f for f in os.listdir(directory) if f.endswith(('.parquet', '.csv'))),
+        key=lambda f: (not f.endswith('.parquet'), f)
+    )
     
-    if not csv_files:
-        print("没有找到 CSV 报告文件")
+    if not report_files:
+        print("没有找到报告文件")
         return
     
-    csv_file = os.path.join(directory, csv_files[0])
-    df = pd.read_csv(csv_file)
+    report_name = report_files[0]
+    df = read_report(os.path.join(directory, report_name))
     
     print(f"\n{'='*80}")
-    print(f"CSV 报告: {csv_files[0]}")
+    print(f"报告: {report_name}")
     print(f"{'='*80}\n")
     
+    # 一次分组得到每个关键词各类型的数据
+    groups = dict(tuple(df.groupby(['keyword', 'type'], sort=False)))
+    
     # 按关键词分组显示
     for keyword in df['keyword'].unique():
-        keyword_data = df[df['keyword'] == keyword]
-        
         print(f"\n关键词: {keyword}")
         print("-" * 80)
         
         # 上升趋势
-        rising = keyword_data[keyword_data['type'] == 'rising']
-        if not rising.empty:
+        rising = groups.get((keyword, 'rising'))
+        if rising is not None:
             print(f"\n📈 上升趋势 (共 {len(rising)} 条):")
             print(tabulate(
                 rising[['related_keywords', 'value']].head(10).values,
@@ -47,8 +75,8 @@ def view_csv_report(directory):
             ))
         
         # 热门趋势
-        top = keyword_data[keyword_data['type'] == 'top']
-        if not top.empty:
+        top = groups.get((keyword, 'top'))
+        if top is not None:
             print(f"\n🔥 热门趋势 (共 {len(top)} 条):")
             print(tabulate(
                 top[['related_keywords', 'value']].head(10).values,
@@ -58,9 +86,14 @@ def view_csv_report(directory):
         
         print()
 
+def _load_json_file(filepath):
+    """读取并解析 JSON 文件"""
+    with open(filepath, 'rb') as f:
+        return _json_loads(f.read())
+
 def view_json_data(directory):
     """查看 JSON 数据"""
-    json_files = [f for f in os.listdir(directory) if f.endswith('.json')]
+    json_files = sorted(f for f in os.listdir(directory) if f.endswith('.json'))
     
     if not json_files:
         print("没有找到 JSON 数据文件")
@@ -70,10 +103,26 @@ def view_json_data(directory):
     print(f"JSON 数据文件 (共 {len(json_files)} 个)")
     print(f"{'='*80}\n")
     
-    for json_file in sorted(json_files):
-        filepath = os.path.join(directory, json_file)
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+    # 先只列出文件名和大小，不解析内容
+    for i, json_file in enumerate(json_files, 1):
+        size = os.stat(os.path.join(directory, json_file)).st_size
+        print(f"{i}. {json_file} ({size / 1024:.1f} KB)")
+    
+    while True:
+        choice = input(f"\n输入文件编号查看详情 (1-{len(json_files)}, 回车返回): ").strip()
+        if not choice:
+            return
+        try:
+            index = int(choice)
+        except ValueError:
+            index = 0
+        if not 1 <= index <= len(json_files):
+            print("无效的选择")
+            continue
+        json_file = json_files[index - 1]
+        
+        # 仅在用户选择时才解析文件
+        data = _load_json_file(os.path.join(directory, json_file))
         
         print(f"\n文件: {json_file}")
         print(f"关键词: {data['keyword']}")
@@ -125,7 +174,7 @@ def main():
     while True:
         print("\n" + "=" * 80)
         print("选择查看方式:")
-        print("1. 查看 CSV 报告（推荐）")
+        print("1. 查看每日报告（推荐）")
         print("2. 查看 JSON 数据文件信息")
         print("3. 切换到其他目录")
         print("0. 退出")
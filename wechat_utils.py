@@ -1,34 +1,63 @@
 import os
-import itchat
 import logging
-from tabulate import tabulate
 import time
+import random
 import threading
-import atexit
-from typing import Optional
+from typing import Dict, List, Optional
 from config import NOTIFICATION_CONFIG
 
+logger = logging.getLogger("wechat_utils")
+
+def _itchat_core(itchat):
+    """返回 itchat 默认的 Core 实例（itchat 1.3/itchat-uos 1.4 为 originInstance，itchat-uos 1.5 为 instance）"""
+    return getattr(itchat, 'originInstance', None) or getattr(itchat, 'instance', None)
+
 class WeChatManager:
     _instance = None
     _lock = threading.Lock()
     _itchat_pkl = 'itchat.pkl'  # itchat默认的缓存文件名
+    _logging_configured = False  # 日志是否已配置
     
     def __new__(cls):
+        # 双重检查锁定：实例已创建时无需加锁
+        instance = cls._instance
+        if instance is not None:
+            return instance
         with cls._lock:
             if cls._instance is None:
-                cls._instance = super(WeChatManager, cls).__new__(cls)
-                cls._instance._initialized = False
+                instance = super(WeChatManager, cls).__new__(cls)
+                instance._initialized = False
+                instance._do_init()
+                instance._initialized = True
+                # 初始化完成后才发布实例，避免其他线程拿到未初始化的对象
+                cls._instance = instance
             return cls._instance
     
     def __init__(self):
-        if self._initialized:
-            return
-            
-        self._initialized = True
+        """初始化已在 __new__ 中完成"""
+        pass
+    
+    def _do_init(self):
+        """初始化单例状态，只在 __new__ 持有类锁时调用一次"""
         self._logged_in = False
         self._login_lock = threading.Lock()
+        # 最近一次确认登录有效的时间，在有效期内跳过状态检查
+        self._last_ok_ts = 0
+        self._status_ttl = 30
         self._is_shutting_down = False
         
+        # 联系人和群聊列表缓存，避免每次查询都访问微信服务器
+        self._contacts_lock = threading.Lock()
+        self._contacts_cache = None
+        self._chatrooms_cache = None
+        self._contacts_cache_ts = 0
+        self._contacts_ttl = 60
+        self._by_remark = {}
+        self._by_nick = {}
+        self._by_group_name = {}
+        self._friend_ids = set()
+        self._chatroom_ids = set()
+        
         # 检查是否需要微信功能
         self._need_wechat = NOTIFICATION_CONFIG['method'] in ['wechat', 'both']
         
@@ -43,43 +72,77 @@ class WeChatManager:
             self._try_load_login_status()
     
     def _setup_logging(self):
-        """设置日志配置"""
-        try:
-            # 检查是否已经配置了日志
-            if not logging.getLogger().handlers:
-                logging.basicConfig(
-                    level=logging.INFO,
-                    format='%(asctime)s - %(levelname)s - %(message)s'
-                )
-            logging.info("Logging setup completed")
-        except Exception as e:
-            print(f"Warning: Failed to setup logging: {str(e)}")
+        """设置日志配置，只执行一次"""
+        if WeChatManager._logging_configured:
+            return
+        # 检查是否已经配置了日志
+        if not logging.getLogger().handlers:
+            logging.basicConfig(
+                level=logging.INFO,
+                format='%(asctime)s - %(levelname)s - %(message)s'
+            )
+        WeChatManager._logging_configured = True
+        logger.info("Logging setup completed")
     
     def _try_load_login_status(self):
         """尝试加载现有的登录状态"""
         try:
-            if os.path.exists(self._itchat_pkl):
-                itchat.auto_login(hotReload=True, statusStorageDir=self._itchat_pkl)
+            # 每次都重新检查文件，其他进程（如 test_wechat_login.py）可能已更新或删除缓存
+            if os.path.isfile(self._itchat_pkl):
+                self._auto_login()
                 if self.check_login_status():
+                    self._reset_contacts()
                     self._logged_in = True
-                    logging.info("Successfully loaded existing login status")
+                    logger.info("Successfully loaded existing login status")
                     return True
         except Exception as e:
-            logging.warning(f"Failed to load existing login status: {str(e)}")
+            logger.warning("Failed to load existing login status: %s", e)
             self.clean_login_cache()
         return False
     
     def clean_login_cache(self):
         """清理登录缓存文件"""
         try:
-            if os.path.exists(self._itchat_pkl):
+            if os.path.isfile(self._itchat_pkl):
                 os.remove(self._itchat_pkl)
-                logging.info("Successfully removed WeChat login cache file")
+                logger.info("Successfully removed WeChat login cache file")
                 return True
         except Exception as e:
-            logging.error(f"Failed to remove WeChat login cache file: {str(e)}")
+            logger.error("Failed to remove WeChat login cache file: %s", e)
         return False
     
+    def _auto_login(self, **kwargs):
+        """使用热登录缓存调用 itchat.auto_login，缓存文件以原子方式写入"""
+        import itchat
+        self._install_atomic_pkl_writer(itchat)
+        itchat.auto_login(hotReload=True, statusStorageDir=self._itchat_pkl, **kwargs)
+    
+    @staticmethod
+    def _install_atomic_pkl_writer(itchat):
+        """让 itchat 先把登录状态写到临时文件再 os.replace，进程中途被杀也不会留下损坏的缓存"""
+        instance = _itchat_core(itchat)
+        dump = getattr(instance, 'dump_login_status', None)
+        if dump is None or getattr(dump, '_atomic', False):
+            return
+        
+        def atomic_dump(fileDir=None):
+            target = fileDir or instance.hotReloadDir
+            # 临时文件名带上进程号，避免与同时登录的其他进程互相覆盖或删除
+            tmp = f"{target}.{os.getpid()}.tmp"
+            try:
+                dump(tmp)
+                os.replace(tmp, target)
+            except BaseException:
+                # 只清理本进程自己的临时文件
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+                raise
+        
+        atomic_dump._atomic = True
+        instance.dump_login_status = atomic_dump
+    
     def login(self, max_retries: int = 3, clean_cache: bool = False) -> bool:
         """登录微信，支持重试机制
         
@@ -98,69 +161,171 @@ class WeChatManager:
             elif self._try_load_login_status():
                 return True
             
+            import requests
             for attempt in range(max_retries):
                 try:
-                    itchat.auto_login(hotReload=True, 
-                                    enableCmdQR=2,
-                                    statusStorageDir=self._itchat_pkl,
-                                    loginCallback=self._on_login,
-                                    exitCallback=self._on_logout,
-                                    qrCallback=lambda uuid, status, qrcode: print(f"\n扫码状态: {status}\n提示: 扫码后请在30秒内点击手机上的'登录'按钮\n"))
+                    self._auto_login(enableCmdQR=2,
+                                     loginCallback=self._on_login,
+                                     exitCallback=self._on_logout,
+                                     qrCallback=lambda uuid, status, qrcode: print(f"\n扫码状态: {status}\n提示: 扫码后请在30秒内点击手机上的'登录'按钮\n"))
+                    self._reset_contacts()
                     self._logged_in = True
-                    logging.info("WeChat logged in successfully")
+                    logger.info("WeChat logged in successfully")
                     return True
                 except KeyboardInterrupt:
-                    logging.info("Login cancelled by user")
+                    logger.info("Login cancelled by user")
                     return False
                 except Exception as e:
-                    logging.error(f"Login attempt {attempt + 1}/{max_retries} failed: {str(e)}")
-                    if attempt < max_retries - 1:
+                    logger.error("Login attempt %s/%s failed: %s", attempt + 1, max_retries, e)
+                    error = str(e).lower()
+                    # 账号被封禁或拒绝访问时重试没有意义
+                    if 'forbidden' in error or 'banned' in error:
+                        break
+                    # 首次失败且不是网络问题时，缓存文件很可能已失效，只清理这一次
+                    # itchat 通过 requests 访问服务器，其异常不继承内置的 ConnectionError
+                    is_network_error = isinstance(e, (OSError, requests.exceptions.RequestException)) or 'timeout' in error
+                    if attempt == 0 and not is_network_error and os.path.isfile(self._itchat_pkl):
                         self.clean_login_cache()
-                        time.sleep(3)
+                    if attempt < max_retries - 1:
+                        # 指数退避并加少量随机抖动: 0.5s, 1s, 2s ... 最多5s
+                        time.sleep(min(2 ** attempt * 0.5, 5) + random.random() * 0.25)
             
+            # 所有重试都失败后才清理缓存，避免临时网络错误导致需要重新扫码
+            self.clean_login_cache()
             self._logged_in = False
             return False
     
+    def _load_contacts(self, update: bool = False):
+        """在持有 _contacts_lock 时加载好友和群聊列表到缓存"""
+        import itchat
+        friends = itchat.get_friends(update=update)
+        chatrooms = itchat.get_chatrooms(update=update)
+        # 本地还没有数据时才从服务器同步
+        if not update and not friends:
+            friends = itchat.get_friends(update=True)
+        if not update and not chatrooms:
+            chatrooms = itchat.get_chatrooms(update=True)
+        
+        # 建立名称到 UserName 的索引，重名时与 itchat 搜索一致取第一个
+        self._by_remark = {f['RemarkName']: f['UserName'] for f in reversed(friends) if f.get('RemarkName')}
+        self._by_nick = {f['NickName']: f['UserName'] for f in reversed(friends) if f.get('NickName')}
+        self._by_group_name = {c['NickName']: c['UserName'] for c in reversed(chatrooms) if c.get('NickName')}
+        self._friend_ids = {f['UserName'] for f in friends}
+        self._chatroom_ids = {c['UserName'] for c in chatrooms}
+        
+        self._contacts_cache = friends
+        self._chatrooms_cache = chatrooms
+        self._contacts_cache_ts = time.monotonic()
+    
+    def _get_friends_cached(self) -> list:
+        """获取好友列表，缓存未过期时直接返回缓存"""
+        with self._contacts_lock:
+            if (self._contacts_cache is None
+                    or time.monotonic() - self._contacts_cache_ts >= self._contacts_ttl):
+                self._load_contacts()
+            return self._contacts_cache
+    
+    def _get_chatrooms_cached(self) -> list:
+        """获取群聊列表，缓存未过期时直接返回缓存"""
+        with self._contacts_lock:
+            if (self._chatrooms_cache is None
+                    or time.monotonic() - self._contacts_cache_ts >= self._contacts_ttl):
+                self._load_contacts()
+            return self._chatrooms_cache
+    
+    def _is_known_user_id(self, user_id: str) -> bool:
+        """检查 UserName 是否属于已缓存的群聊或好友"""
+        self._get_friends_cached()
+        return user_id in self._chatroom_ids or user_id in self._friend_ids
+    
+    def _reset_contacts(self):
+        """清空联系人缓存；每次重新登录后 UserName 都会变化，旧缓存不能再用"""
+        with self._contacts_lock:
+            self._contacts_cache = self._chatrooms_cache = None
+            self._contacts_cache_ts = 0
+            self._by_remark, self._by_nick, self._by_group_name = {}, {}, {}
+            self._friend_ids, self._chatroom_ids = set(), set()
+    
+    def refresh_contacts(self):
+        """强制从微信服务器重新同步好友和群聊列表"""
+        with self._contacts_lock:
+            self._load_contacts(update=True)
+    
     def _on_login(self):
         """登录成功回调"""
         self._logged_in = True
-        logging.info("WeChat login callback: Login successful")
+        logger.info("WeChat login callback: Login successful")
     
     def _on_logout(self):
         """登出回调"""
         self._logged_in = False
-        logging.info("WeChat logout callback: Logged out")
+        self._last_ok_ts = 0
+        self._reset_contacts()
+        logger.info("WeChat logout callback: Logged out")
     
     def check_login_status(self) -> bool:
         """检查当前登录状态"""
         try:
-            # 尝试执行一个简单的API调用来验证登录状态
+            import itchat
+            
+            # 登录后 itchat 会记录自己的 UserName，直接读取属性即可；
+            # logout() 不会清空 userName，因此还要检查 alive
+            core = _itchat_core(itchat)
+            storage = getattr(core, 'storageClass', None)
+            if storage is not None and hasattr(storage, 'userName'):
+                return bool(core.alive and storage.userName)
+            
+            # 不支持时回退到一个简单的API调用来验证登录状态
             friends = itchat.search_friends()
             return bool(friends and len(friends) > 0)
         except Exception as e:
-            logging.warning(f"Login status check failed: {str(e)}")
+            logger.warning("Login status check failed: %s", e)
             self._logged_in = False
             return False
     
     def ensure_login(self) -> bool:
         """确保登录状态，如果未登录则尝试登录"""
         if not self._need_wechat:
-            logging.info("WeChat functionality not needed based on configuration")
+            logger.info("WeChat functionality not needed based on configuration")
             return False
             
         if not self._has_wechat:
-            logging.error("WeChat functionality not available")
+            logger.error("WeChat functionality not available")
             return False
             
-        if self._logged_in and self.check_login_status():
+        if self._logged_in and time.monotonic() - self._last_ok_ts < self._status_ttl:
+            return True
+            
+        if (self._logged_in and self.check_login_status()) or self.login():
+            self._last_ok_ts = time.monotonic()
             return True
-        return self.login()
+        return False
     
     def send_message(self, msg: str, receiver: str) -> bool:
         """发送消息到指定接收者"""
+        return self.send_message_bulk(msg, [receiver])[receiver]
+    
+    def send_message_bulk(self, msg: str, receivers: List[str]) -> Dict[str, bool]:
+        """发送同一条消息到多个接收者
+        
+        登录检查只处理一次，联系人缓存仅在需要解析名称或校验ID时加载，
+        返回每个接收者的发送结果
+        """
+        results = {receiver: False for receiver in receivers}
         if not self.ensure_login():
-            return False
-            
+            return results
+        
+        # 只记录消息的前100个字符，避免日志过长；日志级别不输出时不生成预览
+        preview = None
+        if logger.isEnabledFor(logging.INFO):
+            preview = msg[:100] + '...' if len(msg) > 100 else msg
+        for receiver in results:
+            results[receiver] = self._send_to(msg, receiver, preview)
+        return results
+    
+    def _send_to(self, msg: str, receiver: str, preview: Optional[str]) -> bool:
+        """发送消息到单个接收者，调用前需已确保登录"""
+        import itchat
         try:
             # 如果receiver已经是UserID格式（以@开头），直接使用
             if receiver.startswith('@'):
@@ -169,41 +334,38 @@ class WeChatManager:
                 user_id = self.get_user_id(receiver)
                 
             if not user_id:
-                logging.error(f"Cannot find receiver: {receiver}")
+                logger.error("Cannot find receiver: %s", receiver)
                 return False
             
             # 验证用户ID是否有效
             if user_id != 'filehelper':  # 文件传输助手不需要验证
-                # 尝试更新用户信息
-                if user_id.startswith('@'):
-                    # 检查是否是群聊
-                    if itchat.search_chatrooms(userName=user_id):
-                        pass  # 群聊ID有效
-                    elif itchat.search_friends(userName=user_id):
-                        pass  # 好友ID有效
-                    else:
-                        logging.error(f"Invalid or expired user ID: {user_id}")
+                if user_id.startswith('@') and not self._is_known_user_id(user_id):
+                    # 缓存中找不到时同步一次联系人后再检查
+                    self.refresh_contacts()
+                    if not self._is_known_user_id(user_id):
+                        logger.error("Invalid or expired user ID: %s", user_id)
                         return False
             
             # 发送消息
-            logging.info(f"Sending message to {user_id}")
+            logger.info("Sending message to %s", user_id)
             result = itchat.send(msg, toUserName=user_id)
             
             if result['BaseResponse']['Ret'] != 0:
-                logging.error(f"Failed to send message, error code: {result['BaseResponse']['Ret']}")
+                logger.error("Failed to send message, error code: %s", result['BaseResponse']['Ret'])
+                self._last_ok_ts = 0
                 return False
                 
-            # 只记录消息的前100个字符，避免日志过长
-            preview = msg[:100] + '...' if len(msg) > 100 else msg
-            logging.info(f"Message sent successfully to {user_id}: {preview}")
+            logger.info("Message sent successfully to %s: %s", user_id, preview)
             return True
             
         except Exception as e:
-            logging.error(f"Failed to send message: {str(e)}")
+            logger.error("Failed to send message: %s", e)
+            self._last_ok_ts = 0
             return False
             
     def get_user_id(self, receiver: str) -> Optional[str]:
         """根据备注名或昵称获取用户ID"""
+        import itchat
         try:
             # 如果已经是UserID格式，直接返回
             if receiver.startswith('@'):
@@ -213,76 +375,106 @@ class WeChatManager:
             if receiver.lower() in ['filehelper', 'file helper']:
                 return 'filehelper'
             
-            # 通过备注名搜索
-            users = itchat.search_friends(remarkName=receiver)
-            if users:
-                user_id = users[0]['UserName']
-                logging.info(f"Found user by remarkName: {receiver} -> {user_id}")
+            # 确保缓存和索引是最新的
+            self._get_friends_cached()
+            
+            # 通过备注名、昵称、群名称索引查找
+            user_id = self._by_remark.get(receiver)
+            if user_id:
+                logger.info("Found user by remarkName: %s -> %s", receiver, user_id)
                 return user_id
             
-            # 通过昵称搜索
-            users = itchat.search_friends(nickName=receiver)
+            user_id = self._by_nick.get(receiver)
+            if user_id:
+                logger.info("Found user by nickName: %s -> %s", receiver, user_id)
+                return user_id
+            
+            group_id = self._by_group_name.get(receiver)
+            if group_id:
+                logger.info("Found group: %s -> %s", receiver, group_id)
+                return group_id
+            
+            # 索引未命中时再回退到 itchat 搜索
+            users = itchat.search_friends(remarkName=receiver) or itchat.search_friends(nickName=receiver)
             if users:
                 user_id = users[0]['UserName']
-                logging.info(f"Found user by nickName: {receiver} -> {user_id}")
+                logger.info("Found user by search: %s -> %s", receiver, user_id)
                 return user_id
             
-            # 搜索群聊
             groups = itchat.search_chatrooms(name=receiver)
             if groups:
                 group_id = groups[0]['UserName']
-                logging.info(f"Found group: {receiver} -> {group_id}")
+                logger.info("Found group: %s -> %s", receiver, group_id)
                 return group_id
             
-            logging.error(f"No matching user or group found for: {receiver}")
+            logger.error("No matching user or group found for: %s", receiver)
             return None
             
         except Exception as e:
-            logging.error(f"Error searching for user {receiver}: {str(e)}")
+            logger.error("Error searching for user %s: %s", receiver, e)
             return None
     
-    def logout(self):
-        """主动登出微信"""
+    def logout(self, purge_cache: bool = False):
+        """主动登出微信
+        
+        Args:
+            purge_cache: 是否同时删除登录缓存，默认保留以便下次自动登录
+        """
+        import itchat
         if self._logged_in and not self._is_shutting_down:
             try:
                 self._is_shutting_down = True
                 itchat.logout()
                 self._logged_in = False
-                self.clean_login_cache()  # 清理登录缓存
-                logging.info("WeChat logged out successfully")
+                if purge_cache:
+                    self.clean_login_cache()  # 清理登录缓存
+                logger.info("WeChat logged out successfully")
             except Exception as e:
-                if 'sys.meta_path' not in str(e):  # 忽略Python关闭时的特定错误
-                    logging.warning(f"Error during logout: {str(e)}")
+                logger.warning("Error during logout: %s", e)
             finally:
                 self._is_shutting_down = False
     
-    def __del__(self):
-        """析构函数，不做任何清理"""
-        pass
-    
     def _check_wechat_available(self) -> bool:
         """检查是否安装了itchat"""
         try:
             import itchat
             return True
         except ImportError:
-            logging.warning("WeChat functionality not available: itchat not installed")
+            logger.warning("WeChat functionality not available: itchat not installed")
             return False
     
 # 为了保持向后兼容，保留原有的函数接口
-_manager = WeChatManager()
+_manager = None
+
+def _get_manager():
+    """首次使用时才创建 WeChatManager 单例，避免导入时就加载登录状态"""
+    global _manager
+    if _manager is None:
+        _manager = WeChatManager()
+    return _manager
 
 def setup_logging():
     """设置日志"""
-    _manager._setup_logging()
+    _get_manager()._setup_logging()
 
 def login_wechat():
     """登录微信"""
-    return _manager.login()
+    return _get_manager().login()
 
 def is_logged_in():
     """检查是否已登录"""
-    return _manager.check_login_status()
+    return _get_manager().check_login_status()
+
+# 结果超过该行数时改用更轻量的 'simple' 表格格式
+_GRID_MAX_ROWS = 50
+
+# 搜索联系人时匹配的字段：备注名、昵称、微信号、签名
+_CONTACT_SEARCH_FIELDS = ('RemarkName', 'NickName', 'Alias', 'Signature')
+
+def _format_signature(sig):
+    """截断过长的签名用于表格显示"""
+    sig = sig or ''
+    return sig[:20] + '...' if len(sig) > 20 else sig or '无签名'
 
 def search_contacts(query=None):
     """搜索微信联系人
@@ -290,28 +482,43 @@ def search_contacts(query=None):
     Args:
         query: 搜索关键词，支持备注名、微信号、昵称等，为空则显示所有联系人
     """
+    from tabulate import tabulate
+
+    # 未安装 itchat 时直接返回，不再尝试检查登录状态
+    if not _get_manager()._check_wechat_available():
+        print("微信功能不可用：未安装 itchat")
+        return
+    
     if not is_logged_in():
         if not login_wechat():
             return
     
-    # 获取所有好友
-    friends = itchat.get_friends(update=True)
+    # 获取所有好友（使用缓存）
+    friends = _get_manager()._get_friends_cached()
+    
+    # 只在可搜索的文本字段中匹配，避免把整个联系人字典转成字符串
+    q = query.lower() if query else None
+    matched = (
+        friend for friend in friends
+        if q is None or q in '\n'.join(friend.get(key) or '' for key in _CONTACT_SEARCH_FIELDS).lower()
+    )
     
     # 准备显示的数据
-    contact_data = []
-    for friend in friends:
-        if query is None or query.lower() in str(friend).lower():
-            contact_data.append([
-                friend['UserName'],  # 用户ID
-                friend['RemarkName'] or '无备注',  # 备注名
-                friend['NickName'],  # 昵称
-                friend['Signature'][:20] + '...' if friend['Signature'] and len(friend['Signature']) > 20 else friend['Signature'] or '无签名'  # 签名
-            ])
+    contact_data = [
+        [
+            friend['UserName'],  # 用户ID
+            friend.get('RemarkName') or '无备注',  # 备注名
+            friend.get('NickName'),  # 昵称
+            _format_signature(friend.get('Signature')),  # 签名
+        ]
+        for friend in matched
+    ]
     
     # 使用 tabulate 格式化输出
     if contact_data:
         headers = ['UserName', '备注名', '昵称', '签名']
-        print("\n" + tabulate(contact_data, headers=headers, tablefmt='grid'))
+        fmt = 'grid' if len(contact_data) < _GRID_MAX_ROWS else 'simple'
+        print("\n" + tabulate(contact_data, headers=headers, tablefmt=fmt))
         print(f"\n共找到 {len(contact_data)} 个联系人")
     else:
         print("未找到匹配的联系人")
@@ -322,57 +529,85 @@ def search_groups(query=None):
     Args:
         query: 搜索关键词，支持群名称，为空则显示所有群
     """
+    from tabulate import tabulate
+
+    # 未安装 itchat 时直接返回，不再尝试检查登录状态
+    if not _get_manager()._check_wechat_available():
+        print("微信功能不可用：未安装 itchat")
+        return
+    
     if not is_logged_in():
         if not login_wechat():
             return
     
-    # 获取所有群
-    groups = itchat.get_chatrooms(update=True)
+    # 获取所有群（使用缓存）
+    groups = _get_manager()._get_chatrooms_cached()
+    
+    # 只匹配群名称，避免把包含成员列表的整个字典转成字符串
+    q = query.lower() if query else None
     
     # 准备显示的数据
-    group_data = []
-    for group in groups:
-        if query is None or query.lower() in str(group).lower():
-            group_data.append([
-                group['UserName'],  # 群ID
-                group['NickName'],  # 群名称
-                len(group['MemberList']) if 'MemberList' in group else '未知',  # 成员数量
-            ])
+    group_data = [
+        [
+            group['UserName'],  # 群ID
+            group['NickName'],  # 群名称
+            len(group.get('MemberList') or ()) or '未知',  # 成员数量
+        ]
+        for group in groups
+        if q is None or q in (group.get('NickName') or '').lower()
+    ]
     
     # 使用 tabulate 格式化输出
     if group_data:
         headers = ['UserName', '群名称', '成员数量']
-        print("\n" + tabulate(group_data, headers=headers, tablefmt='grid'))
+        fmt = 'grid' if len(group_data) < _GRID_MAX_ROWS else 'simple'
+        print("\n" + tabulate(group_data, headers=headers, tablefmt=fmt))
         print(f"\n共找到 {len(group_data)} 个群")
     else:
         print("未找到匹配的群")
 
+def refresh_contacts():
+    """从微信服务器重新同步联系人和群列表"""
+    if not _get_manager()._check_wechat_available():
+        print("微信功能不可用：未安装 itchat")
+        return
+    
+    if not is_logged_in():
+        if not login_wechat():
+            return
+    
+    _get_manager().refresh_contacts()
+    print("联系人和群列表已刷新")
+
 def main():
     """主函数"""
     setup_logging()
     
+    # 菜单选项到处理函数的映射
+    actions = {
+        '1': lambda: search_contacts(input("请输入搜索关键词: ").strip()),
+        '2': lambda: search_groups(input("请输入搜索关键词: ").strip()),
+        '3': search_contacts,
+        '4': search_groups,
+        '5': refresh_contacts,
+    }
+    
     while True:
         print("\n=== 微信联系人查询工具 ===")
         print("1. 搜索联系人")
         print("2. 搜索群")
         print("3. 显示所有联系人")
         print("4. 显示所有群")
+        print("5. 刷新联系人和群列表")
         print("0. 退出")
         
-        choice = input("\n请选择功能 (0-4): ").strip()
+        choice = input("\n请选择功能 (0-5): ").strip()
         
         if choice == '0':
             break
-        elif choice in ['1', '2']:
-            query = input("请输入搜索关键词: ").strip()
-            if choice == '1':
-                search_contacts(query)
-            else:
-                search_groups(query)
-        elif choice == '3':
-            search_contacts()
-        elif choice == '4':
-            search_groups()
+        action = actions.get(choice)
+        if action:
+            action()
         else:
             print("无效的选择，请重试")
     